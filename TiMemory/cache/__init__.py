@@ -0,0 +1,6 @@
+"""Caching services."""
+
+from .semantic_cache import SemanticCache
+from .memory_generations import MemoryGenerations
+
+__all__ = ["SemanticCache", "MemoryGenerations"]
@@ -0,0 +1,32 @@
+import redis
+
+from ..config.base import MemoryConfig
+
+
+class MemoryGenerations:
+    """
+    Per-user memory generation counters in Redis, shared by the API processes and the Celery workers.
+    Writers bump a user's generation after their changes commit; search caches include it in their keys.
+    """
+
+    def __init__(self, config: MemoryConfig):
+        self.client = redis.Redis(
+            host=config.redis_host,
+            port=config.redis_port,
+            db=config.redis_db,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"memory_generation:{user_id}"
+
+    def get(self, user_id: str) -> int:
+        """Current generation for a user; raises redis.RedisError when Redis is unavailable"""
+        value = self.client.get(self._key(user_id))
+        return int(value) if value else 0
+
+    def bump(self, user_id: str) -> None:
+        """Start a new generation so results cached before this write are no longer matched"""
+        self.client.incr(self._key(user_id))
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+import threading
+import time
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-process cache that returns values stored for sufficiently similar embeddings.
+    Each namespace keeps its max_entries most recent entries; an entry's tag must match the lookup's to be returned.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int = 256, max_namespaces: int = 1024):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self._namespaces: "OrderedDict[Hashable, List[Tuple[np.ndarray, Any, float, Hashable]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        # float32 matches the embedding API's precision and halves cache memory and scan bandwidth
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, namespace: Hashable, embedding, tag: Hashable = None) -> Optional[Any]:
+        """Return the cached value with the highest cosine similarity above the threshold"""
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if not entries:
+                return None
+            
+            entries[:] = [entry for entry in entries if entry[2] > now]
+            if not entries:
+                del self._namespaces[namespace]
+                return None
+            
+            self._namespaces.move_to_end(namespace)
+            candidates = [entry for entry in entries if entry[3] == tag]
+            if not candidates:
+                return None
+            
+            scores = np.stack([entry[0] for entry in candidates]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return candidates[best][1]
+            return None
+
+    def store(self, namespace: Hashable, embedding, value: Any, tag: Hashable = None) -> None:
+        """Cache a value under the given embedding; entries with other tags age out of the namespace as new ones arrive"""
+        entry = (self._normalize(embedding), value, time.monotonic() + self.ttl_seconds, tag)
+        
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, [])
+            self._namespaces.move_to_end(namespace)
+            entries.append(entry)
+            if len(entries) > self.max_entries:
+                del entries[0]
+            while len(self._namespaces) > self.max_namespaces:
+                self._namespaces.popitem(last=False)
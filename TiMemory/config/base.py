@@ -23,15 +23,29 @@ class MemoryConfig(BaseSettings):
     tidb_use_ssl: bool = True
     tidb_verify_cert: bool = True
     tidb_ssl_ca: Optional[str] = ssl.get_default_verify_paths().cafile
+    tidb_pool_size: int = 8
+    tidb_max_overflow: int = 16
     
     memory_collection_name: str = "memories"
     memory_search_limit: int = 10
     max_context_message_count: int = 20
+    summary_max_output_tokens: int = 400
+    
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl_seconds: int = 3600
+    
+    search_cache_enabled: bool = False
+    search_cache_threshold: float = 0.95
+    search_cache_ttl_seconds: int = 3600
     
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
     
+    session_cache_enabled: bool = False
+    session_cache_ttl_seconds: int = 3600
+    
     knowledge_graph_url: str = ""
     
     logfire_token: Optional[str] = None
@@ -1,10 +1,13 @@
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 from ..schemas.memory import Memory, MemoryResponse, MemoryExtractionResponse, MemoryConsolidationResponse, MemoryConsolidationItem
 from ..config.base import MemoryConfig
 from ..llms.openai import OpenAILLM
 from ..prompts import FACT_EXTRACTION_PROMPT, MEMORY_CONSOLIDATION_PROMPT
 import logging
 
+MAX_SEARCH_WORKERS = 4
+
 class MemoryProcessor:
     """Handles all memory-related operations: extraction, consolidation, and storage."""
     
@@ -15,18 +18,20 @@ class MemoryProcessor:
         self.memory_consolidation_prompt = MEMORY_CONSOLIDATION_PROMPT
         self.logger = logging.getLogger(__name__)
 
-    def process_memories(self, messages: List[Dict[str, str]], user_id: str, search_callback, session_id: str = None) -> List[Memory]:
+    def process_memories(self, messages: List[Dict[str, str]], user_id: str, search_callback, session_id: str = None, embed_callback=None) -> List[Memory]:
         """
         Process messages for memory extraction and consolidation.
+        When embed_callback is given, extracted memories are embedded in one batch and the
+        vectors are passed to search_callback as query_embedding.
         Returns list of Memory objects ready for storage.
         """
         from uuid import uuid4
         from ..schemas.memory import MemoryAttributes
         
-        self.logger.info(f"Starting memory extraction and consolidation for user {user_id} with {len(messages)} messages")
+        self.logger.info("Starting memory extraction and consolidation for user %s with %s messages", user_id, len(messages))
         
         extraction_response = self._extract_memories(messages)
-        self.logger.info(f"Extracted {len(extraction_response.memories)} memories: {extraction_response.memories}")
+        self.logger.info("Extracted %s memories: %s", len(extraction_response.memories), extraction_response.memories)
         
         if not extraction_response or not extraction_response.memories:
             self.logger.info("No memories extracted, returning empty list")
@@ -46,14 +51,14 @@ class MemoryProcessor:
         
         new_memories_response = MemoryConsolidationResponse(memories=consolidation_items)
         
-        existing_memories = self._find_similar_memories(new_memories_response, user_id, search_callback)
+        existing_memories = self._find_similar_memories(new_memories_response, user_id, search_callback, embed_callback)
         if len(existing_memories.memories) == 0:
-            self.logger.info(f"No similar existing memories found, returning {len(new_memories_response.memories)} new memories")
+            self.logger.info("No similar existing memories found, returning %s new memories", len(new_memories_response.memories))
             return [Memory(id=item.id, user_id=user_id, content=item.content, memory_attributes=item.memory_attributes) for item in new_memories_response.memories]
         else:
-            self.logger.info(f"Found {len(existing_memories.memories)} similar existing memories, performing consolidation")
+            self.logger.info("Found %s similar existing memories, performing consolidation", len(existing_memories.memories))
             consolidated_response = self._consolidate_memories(existing_memories, new_memories_response)
-            self.logger.info(f"Consolidation complete, returning {len(consolidated_response.memories)} memories")
+            self.logger.info("Consolidation complete, returning %s memories", len(consolidated_response.memories))
             return [Memory(id=item.id, user_id=user_id, content=item.content, memory_attributes=item.memory_attributes) for item in consolidated_response.memories]
 
         
@@ -61,18 +66,18 @@ class MemoryProcessor:
         """
         Extract memories from a list of messages using the fact extraction prompt.
         """
-        self.logger.info(f"Extracting memories from messages: {messages}")
+        self.logger.debug("Extracting memories from messages: %s", messages)
         try:
             extraction_response = self.llm.generate_parsed_response(
                 instructions=self.fact_extraction_prompt,
                 input=messages,
                 text_format=MemoryExtractionResponse
             ).output_parsed
-            self.logger.info(f"extract memory response: {extraction_response}")
+            self.logger.debug("extract memory response: %s", extraction_response)
             
             return extraction_response
         except Exception as e:
-            self.logger.error(f"Error in _extract_memories: {e}")
+            self.logger.error("Error in _extract_memories: %s", e)
             raise
         
     def _consolidate_memories(self, existing_memories: MemoryConsolidationResponse, new_memories: MemoryConsolidationResponse) -> MemoryConsolidationResponse:
@@ -83,26 +88,41 @@ class MemoryProcessor:
         new_memories_str = "\n".join([memory.model_dump_json() for memory in new_memories.memories])
         input_data = f"EXISTING:\n{existing_memories_str}\nNEW:\n{new_memories_str}"
         
-        self.logger.info(f"Consolidating memories: {input_data}")
+        self.logger.debug("Consolidating memories: %s", input_data)
         
         response = self.llm.generate_parsed_response(
             instructions=self.memory_consolidation_prompt,
             input=input_data,
             text_format=MemoryConsolidationResponse
         ).output_parsed
-        self.logger.info(f"Consolidation response: {response}")
+        self.logger.debug("Consolidation response: %s", response)
         return response
 
-    def _find_similar_memories(self, new_memories: MemoryConsolidationResponse, user_id: str, search_callback) -> MemoryConsolidationResponse:
+    def _find_similar_memories(self, new_memories: MemoryConsolidationResponse, user_id: str, search_callback, embed_callback=None) -> MemoryConsolidationResponse:
         """
         Find similar memories for each new memory to support consolidation.
         """
         existing_memories = []
         seen_ids = set()
         total_searches = len(new_memories.memories)
+        if total_searches == 0:
+            return MemoryConsolidationResponse(memories=existing_memories)
+        
+        contents = [memory.content for memory in new_memories.memories]
+        if embed_callback:
+            embeddings = embed_callback(contents)
+            search = lambda content, embedding: search_callback(
+                content, user_id, self.config.memory_search_limit, query_embedding=embedding
+            )
+        else:
+            embeddings = [None] * total_searches
+            search = lambda content, embedding: search_callback(content, user_id, self.config.memory_search_limit)
+        
+        # Each search is a vector query (plus an embedding request without embed_callback), so run them concurrently
+        with ThreadPoolExecutor(max_workers=min(MAX_SEARCH_WORKERS, total_searches)) as executor:
+            search_results = list(executor.map(search, contents, embeddings))
         
-        for memory in new_memories.memories:
-            similar_memories = search_callback(memory.content, user_id, self.config.memory_search_limit)
+        for similar_memories in search_results:
             for mem in similar_memories:
                 if mem.id not in seen_ids:
                     consolidation_item = MemoryConsolidationItem(
@@ -113,6 +133,6 @@ class MemoryProcessor:
                     existing_memories.append(consolidation_item)
                     seen_ids.add(mem.id)
         
-        self.logger.info(f"Performed {total_searches} similarity searches, found {len(existing_memories)} unique similar memories for consolidation")
+        self.logger.info("Performed %s similarity searches, found %s unique similar memories for consolidation", total_searches, len(existing_memories))
         return MemoryConsolidationResponse(memories=existing_memories)
 
@@ -16,22 +16,23 @@ class SummaryProcessor:
     def generate_conversation_summary(self, recent_messages: List[Dict[str, str]], existing_summary: str = None) -> str:
         """Generate summary from existing summary and recent chat messages."""
         
-        conversation_text = ""
         if existing_summary:
-            conversation_text += f"Existing summary: {existing_summary}\n\nRecent conversation:\n"
+            header = f"Existing summary: {existing_summary}\n\nRecent conversation:\n"
         else:
-            conversation_text += "Conversation to summarize:\n"
+            header = "Conversation to summarize:\n"
         
-        for message in recent_messages:
-            conversation_text += f"{message['role']}: {message['content']}\n"
+        conversation_text = header + "".join(
+            f"{message['role']}: {message['content']}\n" for message in recent_messages
+        )
         
-        self.logger.info(f"Generating summary with input: {conversation_text}")
+        self.logger.debug("Generating summary with input: %s", conversation_text)
         
         response = self.llm.generate_response(
             instructions=self.conversation_summary_prompt,
-            input=conversation_text
+            input=conversation_text,
+            max_output_tokens=self.config.summary_max_output_tokens
         ).output_text
-        self.logger.info(f"Generated summary response: {response}")
+        self.logger.debug("Generated summary response: %s", response)
         return response
 
     def should_generate_summary(self, current_message_count: int, last_summary_at: int) -> bool:
@@ -1,18 +1,69 @@
+from typing import List
 from openai import OpenAI
+from cachetools import LRUCache
 from ..config.base import MemoryConfig
+import hashlib
+import threading
+
+# The embeddings endpoint accepts at most 2048 inputs per request
+EMBEDDING_BATCH_SIZE = 2048
+
+def _cache_key(text: str) -> bytes:
+    """Stable, compact cache key for a text, independent of the per-process str hash seed"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
 class OpenAIEmbeddingModel:
-    def __init__(self, config: MemoryConfig):
+    def __init__(self, config: MemoryConfig, cache_size: int = 10_000):
         self.model = config.embedding_model
         self.model_dims = config.embedding_model_dims
 
         api_key = config.openai_api_key
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, max_retries=3, timeout=30.0)
+        
+        self._cache = LRUCache(maxsize=cache_size)
+        self._cache_lock = threading.Lock()
 
     def embed(self, text: str):
+        key = _cache_key(text)
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+        if embedding is not None:
+            return embedding
+        
         response = self.client.embeddings.create(
             input=text,
             model=self.model,
             dimensions=self.model_dims
         )
-        return response.data[0].embedding
\ No newline at end of file
+        embedding = response.data[0].embedding
+        
+        with self._cache_lock:
+            self._cache[key] = embedding
+        return embedding
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, sending uncached texts together in as few API requests as possible"""
+        keys = [_cache_key(text) for text in texts]
+        with self._cache_lock:
+            embeddings = [self._cache.get(key) for key in keys]
+        
+        missing = {}
+        for index, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(texts[index], []).append(index)
+        
+        missing_texts = list(missing)
+        for start in range(0, len(missing_texts), EMBEDDING_BATCH_SIZE):
+            batch = missing_texts[start:start + EMBEDDING_BATCH_SIZE]
+            response = self.client.embeddings.create(
+                input=batch,
+                model=self.model,
+                dimensions=self.model_dims
+            )
+            with self._cache_lock:
+                for text, item in zip(batch, response.data):
+                    self._cache[_cache_key(text)] = item.embedding
+                    for index in missing[text]:
+                        embeddings[index] = item.embedding
+        
+        return embeddings
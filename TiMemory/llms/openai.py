@@ -1,12 +1,21 @@
 from typing import List, Dict, Optional
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel
 from ..config.base import MemoryConfig
 
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=120.0)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
 class OpenAILLM:
     def __init__(self, config: MemoryConfig):
         self.model = config.model_choice
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.client = OpenAI(
+            api_key=config.openai_api_key,
+            http_client=httpx.Client(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT))
+        self.async_client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            http_client=httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT))
 
     def generate_parsed_response(self, instructions: str, input: List, text_format: str = None):
         response = self.client.responses.parse(
@@ -17,10 +26,29 @@ class OpenAILLM:
         
         return response
     
-    def generate_response(self, instructions: str, input):
+    def generate_response(self, instructions: str, input, max_output_tokens: Optional[int] = None):
+        options = {"max_output_tokens": max_output_tokens} if max_output_tokens else {}
         response = self.client.responses.create(
+            model=self.model,
+            instructions=instructions,
+            input=input,
+            **options)
+        
+        return response
+    
+    async def agenerate_response(self, instructions: str, input):
+        response = await self.async_client.responses.create(
             model=self.model,
             instructions=instructions,
             input=input)
         
         return response
+    
+    async def stream_response(self, instructions: str, input):
+        stream = await self.async_client.responses.create(
+            model=self.model,
+            instructions=instructions,
+            input=input,
+            stream=True)
+        
+        return stream
@@ -21,4 +21,4 @@ class Session(Base):
     last_summary_generated_at: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     last_memory_processed_at: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
-    messages = relationship("Message", back_populates="session", cascade="all, delete-orphan")
+    messages = relationship("Message", back_populates="session", cascade="all, delete-orphan", order_by="Message.created_at")
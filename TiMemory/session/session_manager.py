@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import and_, desc, func
+from sqlalchemy.orm import Session as DBSession, joinedload, load_only, raiseload
+from sqlalchemy import and_, desc, func, insert
 from ..models import Session, Message
 from ..schemas.session import (
     Session as SessionSchema, 
@@ -10,71 +10,130 @@ from ..schemas.session import (
     CreateSessionResponse,
     UpdateSessionRequest
 )
+from ..config.base import MemoryConfig
 from datetime import datetime, timezone
+import redis
 import uuid
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def create_session_cache(config: MemoryConfig) -> Optional[redis.Redis]:
+    """Redis client for caching session ownership, or None when the session cache is disabled"""
+    if not config.session_cache_enabled:
+        return None
+    return redis.Redis(
+        host=config.redis_host,
+        port=config.redis_port,
+        db=config.redis_db,
+        socket_timeout=0.5,
+        socket_connect_timeout=0.5
+    )
+
 class SessionManager:
     """Manager for user sessions and message history"""
     
-    def __init__(self, db_session_factory=None):
+    def __init__(self, db_session_factory=None, cache: Optional[redis.Redis] = None, cache_ttl_seconds: int = 3600):
         self.db_session_factory = db_session_factory
+        self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+    
+    @staticmethod
+    def _owner_cache_key(session_id: str) -> str:
+        return f"session_owner:{session_id}"
+    
+    def _get_cached_owner(self, session_id: str) -> Optional[bytes]:
+        """Read a cached session owner (empty for a deleted session), treating Redis errors as a miss"""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(self._owner_cache_key(session_id))
+        except redis.RedisError as e:
+            logger.warning("Session cache read failed for %s: %s", session_id, e)
+            return None
+    
+    def _set_cached_owner(self, session_id: str, owner: str, overwrite: bool) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(self._owner_cache_key(session_id), owner, ex=self.cache_ttl_seconds, nx=not overwrite)
+        except redis.RedisError as e:
+            logger.warning("Session cache write failed for %s: %s", session_id, e)
     
     def create_session(self, user_id: str, title: Optional[str] = None) -> CreateSessionResponse:
         """Create a new session for the user"""
         with self.db_session_factory() as db:
             try:
                 session_id = str(uuid.uuid4())
+                now = datetime.now(timezone.utc)
                 
                 if not title:
-                    title = f"Session {datetime.now(timezone.utc).strftime('%b %d, %Y')}"
+                    title = f"Session {now.strftime('%b %d, %Y')}"
                 
+                # Timestamps are set client-side so the response doesn't need a refresh round trip
                 session = Session(
                     session_id=session_id,
                     user_id=user_id,
-                    title=title
+                    title=title,
+                    created_at=now,
+                    last_activity=now
                 )
                 
                 db.add(session)
                 db.commit()
-                db.refresh(session)
                 
-                logger.info(f"Created session {session_id} for user {user_id}")
+                logger.info("Created session %s for user %s", session_id, user_id)
                 
                 return CreateSessionResponse(
                     session_id=session_id,
                     user_id=user_id,
                     title=title,
-                    created_at=session.created_at
+                    created_at=now
                 )
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error creating session for user {user_id}: {e}")
+                logger.error("Error creating session for user %s: %s", user_id, e)
                 raise Exception(f"Failed to create session for user {user_id}: {e}")
     
     def get_session(self, session_id: str) -> Optional[SessionSchema]:
         """Get session with all messages"""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(
+                # One joined query for the session and its ordered messages; load_only keeps the
+                # summary and vector columns out of the row repeated for every message, and skips
+                # decoding each message's unused JSON metadata
+                session = db.query(Session).options(
+                    load_only(
+                        Session.session_id,
+                        Session.user_id,
+                        Session.title,
+                        Session.created_at,
+                        Session.last_activity
+                    ),
+                    joinedload(Session.messages).load_only(
+                        Message.role,
+                        Message.content,
+                        Message.created_at
+                    ),
+                    # Any other relationship access raises instead of silently issuing another query
+                    raiseload("*")
+                ).filter(
                     Session.session_id == session_id
                 ).first()
                 
                 if not session:
                     return None
                 
-                messages_query = db.query(Message).filter(
-                    Message.session_id == session_id
-                ).order_by(Message.created_at).all()
-                
                 messages = [
                     SessionMessage(
                         role=msg.role,
                         content=msg.content,
                         timestamp=msg.created_at
-                    ) for msg in messages_query
+                    ) for msg in session.messages
                 ]
                 
                 return SessionSchema(
@@ -87,83 +146,128 @@ class SessionManager:
                     message_count=len(messages)
                 )
             except Exception as e:
-                logger.error(f"Error getting session {session_id}: {e}")
+                logger.error("Error getting session %s: %s", session_id, e)
                 raise Exception(
                     f"Failed to retrieve session {session_id}: {e}"
                 )
     
+    def get_session_owner(self, session_id: str) -> Optional[str]:
+        """
+        Get the user_id that owns a session, or None if it doesn't exist.
+        Ownership never changes, so it is cached in Redis (when enabled) without any invalidation
+        except for deletes; the full session and its messages are always read from the database.
+        """
+        cached = self._get_cached_owner(session_id)
+        if cached is not None:
+            return cached.decode() or None
+        
+        with self.db_session_factory() as db:
+            owner = db.query(Session.user_id).filter(Session.session_id == session_id).scalar()
+        
+        if owner is not None:
+            self._set_cached_owner(session_id, owner, overwrite=False)
+        return owner
+    
     def get_user_sessions(self, user_id: str) -> List[SessionSummary]:
         """Get list of user's sessions (summaries only)"""
         with self.db_session_factory() as db:
             try:
+                # message_count is maintained on every insert, so no join against messages is needed
                 sessions = db.query(
                     Session.session_id,
                     Session.user_id,
                     Session.title,
                     Session.created_at,
-                    Session.last_activity
+                    Session.last_activity,
+                    Session.message_count
                 ).filter(Session.user_id == user_id).order_by(desc(Session.last_activity)).all()
                 
-                summaries = []
-                for sess in sessions:
-                    message_count = db.query(Message).filter(
-                        Message.session_id == sess.session_id
-                    ).count()
-                    
-                    summaries.append(SessionSummary(
+                return [
+                    SessionSummary(
                         session_id=sess.session_id,
                         user_id=sess.user_id,
                         title=sess.title,
                         created_at=sess.created_at,
                         last_activity=sess.last_activity,
-                        message_count=message_count,
-                    ))
-                
-                return summaries
+                        message_count=sess.message_count,
+                    ) for sess in sessions
+                ]
             except Exception as e:
-                logger.error(f"Error getting sessions for user {user_id}: {e}")
+                logger.error("Error getting sessions for user %s: %s", user_id, e)
                 return []
     
     def add_message_to_session(self, session_id: str, role: str, content: str, created_at: datetime) -> bool:
         """Add message to session with explicit timestamp"""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(
+                # Atomic increment in SQL, which also confirms the session exists without a separate SELECT
+                updated = db.query(Session).filter(
                     Session.session_id == session_id
-                ).first()
+                ).update({Session.message_count: Session.message_count + 1}, synchronize_session=False)
                 
-                if not session:
-                    logger.warning(f"Session {session_id} not found")
+                if not updated:
+                    db.rollback()
+                    logger.warning("Session %s not found", session_id)
                     return False
                 
-                message = Message(
-                    id=str(uuid.uuid4()),
+                # Core insert skips building and flushing a Message entity nothing reads back
+                db.execute(insert(Message).values(
+                    id=uuid.uuid4().hex,
                     session_id=session_id,
                     role=role,
                     content=content,
                     created_at=created_at
-                )
+                ))
+                
+                db.commit()
+                
+                logger.debug("Added %s message to session %s", role, session_id)
+                return True
+                
+            except Exception as e:
+                db.rollback()
+                logger.error("Error adding message to session %s: %s", session_id, e)
+                return False
+    
+    def add_messages_to_session(self, session_id: str, messages: List[tuple[str, str, datetime]]) -> bool:
+        """Add several (role, content, created_at) messages to a session in one transaction"""
+        with self.db_session_factory() as db:
+            try:
+                updated = db.query(Session).filter(
+                    Session.session_id == session_id
+                ).update({Session.message_count: Session.message_count + len(messages)}, synchronize_session=False)
+                
+                if not updated:
+                    db.rollback()
+                    logger.warning("Session %s not found", session_id)
+                    return False
                 
-                db.add(message)
-                session.message_count += 1
+                # One executemany INSERT for the whole batch
+                db.execute(insert(Message), [
+                    {
+                        "id": uuid.uuid4().hex,
+                        "session_id": session_id,
+                        "role": role,
+                        "content": content,
+                        "created_at": created_at
+                    } for role, content, created_at in messages
+                ])
                 
                 db.commit()
                 
-                logger.info(f"Added {role} message to session {session_id}")
+                logger.debug("Added %s messages to session %s", len(messages), session_id)
                 return True
                 
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error adding message to session {session_id}: {e}")
+                logger.error("Error adding messages to session %s: %s", session_id, e)
                 return False
     
     def update_session(self, session_id: str, update_data: UpdateSessionRequest) -> bool:
         """Update session metadata"""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(
-                    Session.session_id == session_id
-                ).first()
+                session = db.get(Session, session_id)
                 
                 if not session:
                     return False
@@ -174,68 +278,81 @@ class SessionManager:
                 session.last_activity = datetime.now(timezone.utc)
                 db.commit()
                 
-                logger.info(f"Updated session {session_id}")
+                logger.info("Updated session %s", session_id)
                 return True
                 
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error updating session {session_id}: {e}")
+                logger.error("Error updating session %s: %s", session_id, e)
                 return False
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and all its messages"""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(
+                # Bulk deletes avoid loading every message just to cascade the delete through the ORM
+                db.query(Message).filter(
+                    Message.session_id == session_id
+                ).delete(synchronize_session=False)
+                
+                deleted = db.query(Session).filter(
                     Session.session_id == session_id
-                ).first()
+                ).delete(synchronize_session=False)
                 
-                if not session:
+                if not deleted:
+                    db.rollback()
                     return False
                 
-                db.delete(session)
                 db.commit()
                 
-                logger.info(f"Deleted session {session_id}")
+                # A tombstone rather than a delete, so a concurrent get_session_owner that read the row
+                # before this commit can't re-cache the owner (it only writes when the key is absent)
+                self._set_cached_owner(session_id, "", overwrite=True)
+                logger.info("Deleted session %s", session_id)
                 return True
                 
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error deleting session {session_id}: {e}")
+                logger.error("Error deleting session %s: %s", session_id, e)
                 return False
     
     def generate_session_title(self, first_message: str) -> str:
         """Generate a session title from the first message"""
-        title = first_message.strip()[:50]
-        if len(first_message) > 50:
+        # Only the head of the message can reach the title, so collapse whitespace on that slice alone
+        collapsed = _WHITESPACE_RE.sub(" ", first_message[:200]).strip()
+        title = collapsed[:50]
+        if len(collapsed) > 50:
             title += "..."
         
-        title = " ".join(title.split())
-        
         return title if title else f"Session {datetime.now(timezone.utc).strftime('%b %d')}"
     
     def get_session_message_context(self, session_id: str) -> List[Dict[str, str]]:
-        """Get messages starting from last_summary_generated_at."""
+        """
+        Get messages starting from last_summary_generated_at.
+        Messages are in chronological order with only role and content, so consecutive turns
+        return byte-identical prefixes and the LLM prompt cache can reuse them.
+        """
         with self.db_session_factory() as db:
-            session = db.query(Session).filter(Session.session_id == session_id).first()
-            if not session:
+            last_summary_at = db.query(Session.last_summary_generated_at).filter(
+                Session.session_id == session_id
+            ).scalar()
+            if last_summary_at is None:
                 return []
             
-            last_summary_at = session.last_summary_generated_at
-            
-            messages = db.query(Message).filter(
+            # Select only role and content so rows aren't hydrated into Message objects
+            messages = db.query(Message.role, Message.content).filter(
                 Message.session_id == session_id
             ).order_by(Message.created_at).offset(last_summary_at).all()
             
-            return [{"role": msg.role, "content": msg.content} for msg in messages]
+            return [{"role": role, "content": content} for role, content in messages]
 
     def update_session_summary(self, session_id: str, content: str, vector: List[float], message_count: int) -> bool:
         """Update session with new summary content and metadata."""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(Session.session_id == session_id).first()
+                session = db.get(Session, session_id)
                 if not session:
-                    logger.error(f"Session {session_id} not found")
+                    logger.error("Session %s not found", session_id)
                     return False
                 
                 session.summary = content
@@ -245,11 +362,11 @@ class SessionManager:
                 
                 db.commit()
                 
-                logger.info(f"Updated summary for session {session_id} at message count {message_count}")
+                logger.info("Updated summary for session %s at message count %s", session_id, message_count)
                 return True
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error updating summary for session {session_id}: {e}")
+                logger.error("Error updating summary for session %s: %s", session_id, e)
                 return False
 
     def get_message_count(self, session_id: str) -> int:
@@ -257,54 +374,68 @@ class SessionManager:
         with self.db_session_factory() as db:
             return db.query(Message).filter(Message.session_id == session_id).count()
 
+    def get_processing_state(self, session_id: str) -> Dict[str, int]:
+        """Get message count and memory/summary processing markers for a session in one query."""
+        with self.db_session_factory() as db:
+            message_count = db.query(func.count(Message.id)).filter(
+                Message.session_id == session_id
+            ).scalar_subquery()
+            
+            row = db.query(
+                message_count.label("message_count"),
+                Session.last_memory_processed_at,
+                Session.last_summary_generated_at
+            ).filter(Session.session_id == session_id).first()
+            
+            if not row:
+                return {"message_count": 0, "last_memory_processed_at": 0, "last_summary_generated_at": 0}
+            
+            return {
+                "message_count": row.message_count,
+                "last_memory_processed_at": row.last_memory_processed_at,
+                "last_summary_generated_at": row.last_summary_generated_at
+            }
+
     def get_session_summary(self, session_id: str) -> Optional[str]:
         """Get current session summary content from session table."""
         with self.db_session_factory() as db:
-            session = db.query(Session).filter(Session.session_id == session_id).first()
-            return session.summary if session else None
+            return db.query(Session.summary).filter(Session.session_id == session_id).scalar()
     
     def get_last_memory_processed_at(self, session_id: str) -> int:
         """Get the message count when memory was last processed."""
         with self.db_session_factory() as db:
-            session = db.query(Session).filter(Session.session_id == session_id).first()
-            return session.last_memory_processed_at if session else 0
+            return db.query(Session.last_memory_processed_at).filter(Session.session_id == session_id).scalar() or 0
     
     def get_last_summary_generated_at(self, session_id: str) -> int:
         """Get the message count when summary was last generated."""
         with self.db_session_factory() as db:
-            session = db.query(Session).filter(Session.session_id == session_id).first()
-            return session.last_summary_generated_at if session else 0
+            return db.query(Session.last_summary_generated_at).filter(Session.session_id == session_id).scalar() or 0
     
     def update_last_memory_processed_at(self, session_id: str, message_count: int) -> bool:
         """Update the last memory processed message count."""
         with self.db_session_factory() as db:
             try:
-                session = db.query(Session).filter(Session.session_id == session_id).first()
+                session = db.get(Session, session_id)
                 if not session:
-                    logger.error(f"Session {session_id} not found")
+                    logger.error("Session %s not found", session_id)
                     return False
                 
                 session.last_memory_processed_at = message_count
                 db.commit()
                 
-                logger.info(f"Updated last memory processed at for session {session_id}: {message_count}")
+                logger.info("Updated last memory processed at for session %s: %s", session_id, message_count)
                 return True
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error updating last memory processed at for session {session_id}: {e}")
+                logger.error("Error updating last memory processed at for session %s: %s", session_id, e)
                 return False
     
     def get_messages_since_count(self, session_id: str, since_count: int) -> List[Dict[str, str]]:
         """Get messages from a specific message count onwards."""
         with self.db_session_factory() as db:
             # Get messages ordered by creation time, skip the first 'since_count' messages
-            messages = db.query(Message).filter(
+            messages = db.query(Message.role, Message.content).filter(
                 Message.session_id == session_id
             ).order_by(Message.created_at).offset(since_count).all()
             
-            return [{"role": msg.role, "content": msg.content} for msg in messages]
-
-
-
-
-session_manager = SessionManager()
\ No newline at end of file
+            return [{"role": role, "content": content} for role, content in messages]
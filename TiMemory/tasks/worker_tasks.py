@@ -1,19 +1,48 @@
 import asyncio
+import functools
 import logging
-from typing import List, Dict
+import random
+from typing import List, Dict, Optional, Tuple
+import redis
 from celery import Task
 from ..config.base import MemoryConfig
 from ..celery_app import celery_app
 from ..tidb import TiDB
 from ..embedding.openai import OpenAIEmbeddingModel
 from ..llms.openai import OpenAILLM
-from ..session.session_manager import SessionManager
+from ..session.session_manager import SessionManager, create_session_cache
+from ..cache import MemoryGenerations
 from ..core import MemoryProcessor, SummaryProcessor
 from ..schemas.memory import Memory
 from ..knowledge_graph_client import KnowledgeGraphClient
 
 logger = logging.getLogger(__name__)
 
+RETRY_COUNTDOWN_SECONDS = 60
+RETRY_JITTER_SECONDS = 30
+
+
+def _retry_countdown() -> float:
+    """Retry delay with random jitter so failed tasks across workers don't retry in lockstep."""
+    return RETRY_COUNTDOWN_SECONDS + random.uniform(-RETRY_JITTER_SECONDS, RETRY_JITTER_SECONDS)
+
+@functools.lru_cache(maxsize=None)
+def _get_services() -> Tuple[MemoryConfig, TiDB, OpenAIEmbeddingModel, OpenAILLM, SessionManager, Optional[MemoryGenerations]]:
+    """
+    Build the worker's TiDB engine and API clients once per process and reuse them across tasks.
+    """
+    config = MemoryConfig()
+    tidb = TiDB(config)
+    embedder = OpenAIEmbeddingModel(config)
+    llm = OpenAILLM(config)
+    session_manager = SessionManager(
+        db_session_factory=tidb.SessionLocal,
+        cache=create_session_cache(config),
+        cache_ttl_seconds=config.session_cache_ttl_seconds
+    )
+    memory_generations = MemoryGenerations(config) if config.search_cache_enabled else None
+    return config, tidb, embedder, llm, session_manager, memory_generations
+
 class AsyncTask(Task):
     def __call__(self, *args, **kwargs):
         loop = asyncio.new_event_loop()
@@ -32,22 +61,20 @@ def process_memories(self, messages: List[Dict[str, str]], user_id: str, session
     try:
         logger.info(f"Starting background memory processing for user {user_id}, session {session_id}")
         
-        config = MemoryConfig()
-        tidb = TiDB(config)
-        embedder = OpenAIEmbeddingModel(config)
-        llm = OpenAILLM(config)
-        session_manager = SessionManager(db_session_factory=tidb.SessionLocal)
+        config, tidb, embedder, llm, session_manager, memory_generations = _get_services()
         memory_processor = MemoryProcessor(config=config, llm=llm)
         
-        def search_callback(query: str, user_id: str, limit: int) -> List[Memory]:
-            embedding = embedder.embed(query)
+        def search_callback(query: str, user_id: str, limit: int, query_embedding: Optional[List[float]] = None) -> List[Memory]:
+            embedding = query_embedding if query_embedding is not None else embedder.embed(query)
             results = tidb.search_memories(embedding, user_id, limit=limit)
             return results.memories
         
-        processed_memories = memory_processor.process_memories(messages, user_id, search_callback, session_id)
+        processed_memories = memory_processor.process_memories(
+            messages, user_id, search_callback, session_id, embed_callback=embedder.embed_batch
+        )
         
         if processed_memories:
-            _store_memories(processed_memories, user_id, tidb, embedder)
+            _store_memories(processed_memories, user_id, tidb, embedder, memory_generations)
         
         current_message_count = session_manager.get_message_count(session_id)
         session_manager.update_last_memory_processed_at(session_id, current_message_count)
@@ -65,7 +92,7 @@ def process_memories(self, messages: List[Dict[str, str]], user_id: str, session
         
     except Exception as e:
         logger.error(f"Error in background memory processing for user {user_id}: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=_retry_countdown(), max_retries=3)
         raise
 
 @celery_app.task(bind=True)
@@ -76,11 +103,7 @@ def process_summary(self, session_id: str):
     try:
         logger.info(f"Starting background summary processing for session {session_id}")
         
-        config = MemoryConfig()
-        tidb = TiDB(config)
-        embedder = OpenAIEmbeddingModel(config)
-        llm = OpenAILLM(config)
-        session_manager = SessionManager(db_session_factory=tidb.SessionLocal)
+        config, tidb, embedder, llm, session_manager, _ = _get_services()
         summary_processor = SummaryProcessor(config=config, llm=llm)
         
         _generate_and_update_summary(session_id, session_manager, summary_processor, embedder)
@@ -90,39 +113,47 @@ def process_summary(self, session_id: str):
         
     except Exception as e:
         logger.error(f"Error in background summary processing for session {session_id}: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=_retry_countdown(), max_retries=3)
         raise
 
 
-def _store_memories(memories: List[Memory], user_id: str, tidb: TiDB, embedder: OpenAIEmbeddingModel):
+def _store_memories(memories: List[Memory], user_id: str, tidb: TiDB, embedder: OpenAIEmbeddingModel, memory_generations: Optional[MemoryGenerations] = None):
     """
     Store memories in TiDB. Handles new memories and updates.
+    Once the write commits, the user's memory generation is bumped so API processes stop serving cached searches.
     """
-    inserted_count = 0
-    updated_count = 0
+    new_memories = []
+    updated_memories = []
+    
+    embeddings = embedder.embed_batch([memory.content for memory in memories])
     
-    for memory in memories:
-        embedding = embedder.embed(memory.content)
+    for memory, embedding in zip(memories, embeddings):
         status = memory.memory_attributes.status
         
         if status == 'outdated':
-            tidb.update_memory(
-                id=memory.id,
-                vector=embedding,
-                memory_attributes=memory.memory_attributes.model_dump()
-            )
-            updated_count += 1
+            updated_memories.append({
+                "id": memory.id,
+                "vector": embedding,
+                "memory_attributes": memory.memory_attributes.model_dump()
+            })
         else:
-            tidb.insert_memory(
-                id=memory.id,
-                vector=embedding,
-                user_id=user_id,
-                content=memory.content,
-                memory_attributes=memory.memory_attributes.model_dump()
-            )
-            inserted_count += 1
+            new_memories.append({
+                "id": memory.id,
+                "vector": embedding,
+                "user_id": user_id,
+                "content": memory.content,
+                "memory_attributes": memory.memory_attributes.model_dump()
+            })
+    
+    tidb.save_memories(new_memories, updated_memories)
+    
+    if memory_generations is not None:
+        try:
+            memory_generations.bump(user_id)
+        except redis.RedisError as e:
+            logger.warning("Could not invalidate search cache for user %s: %s", user_id, e)
     
-    logger.info(f"Stored {inserted_count} new and {updated_count} updated memories for user {user_id}")
+    logger.info("Stored %s new and %s updated memories for user %s", len(new_memories), len(updated_memories), user_id)
 
 
 def _generate_and_update_summary(session_id: str, session_manager: SessionManager, summary_processor: SummaryProcessor, embedder: OpenAIEmbeddingModel):
@@ -1,14 +1,29 @@
 from typing import List, Dict, Optional, Any
 from uuid import uuid4
 import logging
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text, insert, update, delete, bindparam
 from sqlalchemy.orm import sessionmaker, defer
 from .models import Base
 from .config.base import MemoryConfig
-from .schemas.memory import MemoryResponse, Memory as MemorySchema
+from .schemas.memory import MemoryResponse, MemoryAttributes, Memory as MemorySchema
 
 logger = logging.getLogger(__name__)
 
+DELETE_CHUNK_SIZE = 1000
+VECTOR_INDEX_NAME = "idx_memories_vector_cosine"
+
+
+def _to_memory_schema(row) -> MemorySchema:
+    """Build a Memory schema from a trusted ORM row without re-running validation"""
+    return MemorySchema.model_construct(
+        id=row.id,
+        user_id=row.user_id,
+        content=row.content,
+        memory_attributes=MemoryAttributes.model_construct(**(row.memory_attributes or {})),
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
 class TiDB:
     def __init__(self, config: MemoryConfig):
         self.config = config
@@ -16,24 +31,31 @@ class TiDB:
         self.SessionLocal = None
         self.memory_model = None
         
+        from .models.memory import Memory
+        self.memory_model = Memory
+        
         self._initialize_database()
         self._create_tables()
         
-        from .models.memory import Memory
-        self.memory_model = Memory
+        memory_table = Memory.__table__
+        self._delete_memories_stmt = delete(memory_table).where(
+            memory_table.c.id.in_(bindparam("ids", expanding=True))
+        )
         
     def _initialize_database(self):
         """Initialize database connection with config"""
         try:
-            logger.info(f"TiMemory connecting to database: {self.config.tidb_host}:{self.config.tidb_port}")
+            logger.info("TiMemory connecting to database: %s:%s", self.config.tidb_host, self.config.tidb_port)
             self.engine = create_engine(
                 self.config.tidb_connection_string,
+                pool_size=self.config.tidb_pool_size,
+                max_overflow=self.config.tidb_max_overflow,
                 pool_pre_ping=True,
                 pool_recycle=3600,
             )
             logger.info("TiMemory database engine created successfully")
         except Exception as e:
-            logger.error(f"TiMemory failed to create database engine: {e}")
+            logger.error("TiMemory failed to create database engine: %s", e)
             raise
         
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
@@ -50,14 +72,49 @@ class TiDB:
             missing_tables = required_tables - existing_tables
             
             if missing_tables:
-                logger.info(f"Creating missing TiMemory database tables: {', '.join(missing_tables)}")
+                logger.info("Creating missing TiMemory database tables: %s", ', '.join(missing_tables))
                 Base.metadata.create_all(bind=self.engine)
                 logger.info("TiMemory database tables created successfully")
             else:
                 logger.debug("All TiMemory database tables already exist")
+            
+            self._create_missing_indexes(inspector, existing_tables)
         except Exception as e:
-            logger.error(f"Error creating TiMemory database tables: {e}")
+            logger.error("Error creating TiMemory database tables: %s", e)
             raise
+        
+        self._create_vector_index()
+
+    def _create_vector_index(self):
+        """Create the HNSW cosine index on memory vectors so similarity search can use ANN instead of a full scan"""
+        try:
+            table_name = self.memory_model.__tablename__
+            with self.engine.connect() as connection:
+                existing_indexes = {row.Key_name for row in connection.execute(text(f"SHOW INDEX FROM {table_name}"))}
+                if VECTOR_INDEX_NAME in existing_indexes:
+                    return
+                
+                logger.info("Creating TiMemory vector index %s", VECTOR_INDEX_NAME)
+                connection.execute(text(
+                    f"ALTER TABLE {table_name} ADD VECTOR INDEX {VECTOR_INDEX_NAME} "
+                    "((VEC_COSINE_DISTANCE(vector))) USING HNSW"
+                ))
+                connection.commit()
+        except Exception as e:
+            # Vector indexes need TiFlash; searches still work without one, just as full scans
+            logger.warning("Could not create TiMemory vector index %s: %s", VECTOR_INDEX_NAME, e)
+
+    def _create_missing_indexes(self, inspector, existing_tables: set):
+        """Add indexes declared on the models to tables that were created before the index existed"""
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logger.info("Creating missing TiMemory index %s on %s", index.name, table.name)
+                    index.create(bind=self.engine)
 
     def get_db(self):
         """Get database session"""
@@ -89,10 +146,31 @@ class TiDB:
                 db.refresh(memory)
             except Exception as e:
                 db.rollback()
-                logger.error(f"Failed to insert memory: {e}")
+                logger.error("Failed to insert memory: %s", e)
                 raise
         return id
     
+    def save_memories(self, new_memories: List[Dict], updated_memories: List[Dict]):
+        """
+        Insert new memories and update existing ones in a single transaction.
+        Updated memory dicts carry an "id" plus the columns to change.
+        """
+        table = self.memory_model.__table__
+        with self.SessionLocal() as db:
+            try:
+                if new_memories:
+                    db.execute(insert(table), new_memories)
+                if updated_memories:
+                    db.execute(
+                        update(table).where(table.c.id == bindparam("memory_id")),
+                        [{"memory_id": memory["id"], **{k: v for k, v in memory.items() if k != "id"}} for memory in updated_memories]
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error("Failed to save memories: %s", e)
+                raise
+    
     def search_memories(self, query_vector: List[float], user_id: str, limit: int) -> MemoryResponse:
         """Search for memories similar to the query vector using cosine similarity"""
         with self.SessionLocal() as db:
@@ -102,22 +180,29 @@ class TiDB:
                 self.memory_model.vector.cosine_distance(query_vector)
             ).limit(limit).all()
             
-            memory_schemas = [MemorySchema.model_validate(result, from_attributes=True) for result in results]
+            memory_schemas = [_to_memory_schema(result) for result in results]
             
-            logger.debug(f"Memory search returned {len(results)} results for user: {user_id}")
+            logger.debug("Memory search returned %s results for user: %s", len(results), user_id)
             return MemoryResponse(memories=memory_schemas)
     
         
     def delete_memory(self, id: str):
         """Delete a memory by its ID"""
+        if self.delete_memories([id]):
+            logger.info("Deleted memory with ID: %s", id)
+        else:
+            logger.warning("Memory with ID: %s not found", id)
+
+    def delete_memories(self, ids: List[str]) -> int:
+        """Delete memories by ID with one DELETE ... IN statement per chunk of IDs"""
+        logger.debug("Deleting memories with IDs: %r", ids)
+        deleted_count = 0
         with self.SessionLocal() as db:
-            memory = db.query(self.memory_model).filter(self.memory_model.id == id).first()
-            if memory:
-                db.delete(memory)
-                db.commit()
-                logger.info(f"Deleted memory with ID: {id}")
-            else:
-                logger.warning(f"Memory with ID: {id} not found")
+            for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+                chunk = ids[start:start + DELETE_CHUNK_SIZE]
+                deleted_count += db.execute(self._delete_memories_stmt, {"ids": chunk}).rowcount
+            db.commit()
+        return deleted_count
 
     def update_memory(self, id: str, vector: Optional[List[float]] = None, content: Optional[str] = None, memory_attributes: Optional[Dict] = None):
         """Update a memory by its ID"""
@@ -132,32 +217,34 @@ class TiDB:
                     memory.memory_attributes = memory_attributes
                 
                 db.commit()
-                logger.info(f"Updated memory with ID: {id}")
+                logger.info("Updated memory with ID: %s", id)
             else:
-                logger.warning(f"Memory with ID: {id} not found")
+                logger.warning("Memory with ID: %s not found", id)
         
     def get_memory(self, id: str) -> Optional[Any]:
         """Get a memory by its ID"""
         with self.SessionLocal() as db:
             memory = db.query(self.memory_model).filter(self.memory_model.id == id).first()
             if memory:
-                logger.info(f"Retrieved memory with ID: {id}")
+                logger.info("Retrieved memory with ID: %s", id)
                 return memory
             else:
-                logger.warning(f"Memory with ID: {id} not found")
+                logger.warning("Memory with ID: %s not found", id)
                 return None
     
     def get_memories_by_user(self, user_id: str, limit: Optional[int] = None) -> MemoryResponse:
         """Get all memories for a specific user"""
         with self.SessionLocal() as db:
-            query = db.query(self.memory_model).filter(self.memory_model.user_id == user_id).order_by(self.memory_model.created_at.desc())
+            query = db.query(self.memory_model).options(defer(self.memory_model.vector)).filter(
+                self.memory_model.user_id == user_id
+            ).order_by(self.memory_model.created_at.desc())
             if limit:
                 query = query.limit(limit)
             
             results = query.all()
-            logger.info(f"Retrieved {len(results)} memories for user: {user_id}")
+            logger.info("Retrieved %s memories for user: %s", len(results), user_id)
             
-            memory_schemas = [MemorySchema.model_validate(result, from_attributes=True) for result in results]
+            memory_schemas = [_to_memory_schema(result) for result in results]
             return MemoryResponse(memories=memory_schemas)
 
     def delete_all_memories(self, user_id: str):
@@ -165,4 +252,4 @@ class TiDB:
         with self.SessionLocal() as db:
             deleted_count = db.query(self.memory_model).filter(self.memory_model.user_id == user_id).delete()
             db.commit()
-            logger.info(f"Deleted {deleted_count} memories for user: {user_id}")
\ No newline at end of file
+            logger.info("Deleted %s memories for user: %s", deleted_count, user_id)
\ No newline at end of file
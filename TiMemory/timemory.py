@@ -1,20 +1,45 @@
 from .llms.openai import OpenAILLM
 from .embedding.openai import OpenAIEmbeddingModel
 from .tidb import TiDB
-from .session.session_manager import SessionManager
+from .session.session_manager import SessionManager, create_session_cache
 from .knowledge_graph_client import KnowledgeGraphClient
-from typing import List, Dict
+from .cache import SemanticCache, MemoryGenerations
+from typing import Any, List, Dict, Optional
 from .schemas.memory import Memory, MemoryResponse
 from .config.base import MemoryConfig
-from TiMemory.tasks.worker_tasks import process_memories
+from TiMemory.tasks.worker_tasks import process_memories, process_summary
 from .core import MemoryProcessor, SummaryProcessor, TopicProcessor
+from .prompts import SYSTEM_PROMPT
 
+from cachetools import TTLCache
+from datetime import datetime, timezone
+
+import asyncio
+import hashlib
+import json
 import logging
+import redis
+import threading
+
+# Sections are ordered from most to least stable: OpenAI prompt caching matches on the exact
+# leading bytes. The summary only changes when it is regenerated and the session context is
+# append-only, so both extend a cached prefix turn over turn; the per-query memories go last.
+_INSTRUCTIONS_TEMPLATE = SYSTEM_PROMPT + "\n SUMMARY: {summary}\n SESSION CONTEXT: {session_context}\n MEMORIES: {memories}"
+
+# Upper bound on memories returned by a single search
+_MAX_SEARCH_LIMIT = 100
+
+# Short acknowledgements that never benefit from memory retrieval
+_FILLER_QUERIES = frozenset({
+    "ok", "okay", "k", "thanks", "thank you", "thx", "ty", "hi", "hello", "hey", "yes", "no",
+    "yep", "nope", "sure", "cool", "nice", "great", "bye", "goodbye", "lol", "hmm"
+})
 
 class TiMemory:
     def __init__(self, config: MemoryConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self._background_tasks = set()
         
         self._setup_services()
         
@@ -25,7 +50,9 @@ class TiMemory:
         self.llm = OpenAILLM(self.config)
         
         self.session_manager = SessionManager(
-            db_session_factory=self.tidb.SessionLocal
+            db_session_factory=self.tidb.SessionLocal,
+            cache=create_session_cache(self.config),
+            cache_ttl_seconds=self.config.session_cache_ttl_seconds
         )
         
         self.memory_processor = MemoryProcessor(
@@ -47,81 +74,252 @@ class TiMemory:
         self.knowledge_graph_client = KnowledgeGraphClient(
             config=self.config
         )
+        
+        self.response_cache = SemanticCache(
+            threshold=self.config.semantic_cache_threshold,
+            ttl_seconds=self.config.semantic_cache_ttl_seconds
+        )
+        
+        self.exact_response_cache = TTLCache(
+            maxsize=10_000,
+            ttl=self.config.semantic_cache_ttl_seconds
+        )
+        # TTLCache mutates its expiry and LRU order even on reads, so every access holds this lock
+        self._exact_response_cache_lock = threading.Lock()
+        
+        # Namespaced by user so each user keeps at most 64 recent searches across generations
+        self.search_cache = SemanticCache(
+            threshold=self.config.search_cache_threshold,
+            ttl_seconds=self.config.search_cache_ttl_seconds,
+            max_entries=64
+        )
+        
+        self.exact_search_cache = TTLCache(
+            maxsize=10_000,
+            ttl=self.config.search_cache_ttl_seconds
+        )
+        self._exact_search_cache_lock = threading.Lock()
+        # Memories are written by Celery workers, so the generation that invalidates cached searches lives in Redis
+        self.memory_generations = MemoryGenerations(self.config) if self.config.search_cache_enabled else None
+        self._search_cache_stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
 
 
-    def _should_process_memories(self, session_id: str) -> bool:
+    def _should_process_memories(self, session_id: str, state: Dict[str, int]) -> bool:
         """Check if there are new messages to process."""
-        last_processed_at = self.session_manager.get_last_memory_processed_at(session_id)
-        current_message_count = self.session_manager.get_message_count(session_id)
+        last_processed_at = state["last_memory_processed_at"]
+        current_message_count = state["message_count"]
         
         if current_message_count <= last_processed_at:
-            self.logger.info(f"No new messages to process for session {session_id} (current: {current_message_count}, last processed: {last_processed_at})")
+            self.logger.info("No new messages to process for session %s (current: %s, last processed: %s)", session_id, current_message_count, last_processed_at)
             return False
         
         return True
 
-    def _get_unprocessed_messages(self, session_id: str) -> List[Dict[str, str]]:
+    def _get_unprocessed_messages(self, session_id: str, state: Dict[str, int]) -> List[Dict[str, str]]:
         """Get messages from last processed point to current."""
-        last_processed_at = self.session_manager.get_last_memory_processed_at(session_id)
-        
         return self.session_manager.get_messages_since_count(
-            session_id, last_processed_at
+            session_id, state["last_memory_processed_at"]
         )
 
     def _trigger_memory_processing(self, messages: List[Dict[str, str]], user_id: str, session_id: str) -> None:
         """Queue memory processing for background execution."""
-        from TiMemory.tasks.worker_tasks import process_memories
-        
         task = process_memories.delay(messages, user_id, session_id)
-        self.logger.info(f"Queued background memory processing task {task.id} for user {user_id}")
+        self.logger.info("Queued background memory processing task %s for user %s", task.id, user_id)
 
 
-    def _check_summary_needed(self, session_id: str) -> bool:
+    def _check_summary_needed(self, state: Dict[str, int]) -> bool:
         """Check if summary generation is needed based on max_context_message_count."""
-        current_message_count = self.session_manager.get_message_count(session_id)
-        last_summary_at = self.session_manager.get_last_summary_generated_at(session_id)
-        messages_since_summary = current_message_count - last_summary_at
+        messages_since_summary = state["message_count"] - state["last_summary_generated_at"]
         return messages_since_summary >= self.config.max_context_message_count
 
     def _generate_and_update_summary(self, session_id: str) -> None:
         """Queue summary processing for background execution."""
-        from TiMemory.tasks.worker_tasks import process_summary
-        
         task = process_summary.delay(session_id)
-        self.logger.info(f"Queued background summary processing task {task.id} for session {session_id}")
+        self.logger.info("Queued background summary processing task %s for session %s", task.id, session_id)
+
+    async def _fetch_session_state(self, session_id: str) -> tuple[Optional[str], List[Dict[str, str]]]:
+        """Read the session summary and message context concurrently."""
+        return await asyncio.gather(
+            asyncio.to_thread(self.session_manager.get_session_summary, session_id),
+            asyncio.to_thread(self.session_manager.get_session_message_context, session_id)
+        )
+
+    async def _build_request(
+        self,
+        message: str,
+        user_id: str,
+        session_id: str,
+        query_embedding: Optional[List[float]] = None,
+        session_state: Optional[asyncio.Future] = None
+    ) -> tuple[str, List[Dict[str, str]], List[Memory]]:
+        """
+        Build the LLM instructions (system prompt, memories, summary, and session context) and input for a chat turn.
+        session_state is an already started _fetch_session_state task, if any.
+        """
+        (summary, session_context), (memories_context, memories) = await asyncio.gather(
+            session_state if session_state is not None else self._fetch_session_state(session_id),
+            asyncio.to_thread(self.search_with_context, message, user_id, self.config.memory_search_limit, query_embedding)
+        )
+        
+        instructions = _INSTRUCTIONS_TEMPLATE.format(
+            memories=memories_context,
+            summary=" ".join(summary.split()) if summary else "",
+            session_context=json.dumps(session_context, ensure_ascii=False, sort_keys=True)
+        )
+        user_message = [{"role": "user", "content": message}]
+        
+        return instructions, user_message, memories
 
-    def _build_context(self, message: str, user_id: str, session_id: str) -> tuple[str, List[Memory]]:
-        """Build complete context including system prompt, memories, summary, and session context."""
-        from .prompts import SYSTEM_PROMPT
+    def _lookup_similar_response(self, message: str, user_id: str, session_id: str):
+        """
+        Embed the message and return the embedding with any cached (response, memories) for a similar earlier message.
+        """
+        embedding = self.embedder.embed(message)
+        return embedding, self.response_cache.lookup((user_id, session_id), embedding)
+
+    async def _check_response_cache(self, message: str, user_id: str, session_id: str):
+        """
+        Look up the response cache for a chat turn.
+        Identical messages are answered from the exact-match cache without computing an embedding.
+        Otherwise the embedding and similarity lookup run off the event loop, with the session reads
+        started alongside them and returned as a task for _build_request.
+        Returns (embedding, cached, session_state).
+        """
+        if not self.config.semantic_cache_enabled:
+            return None, None, None
         
-        summary = self.session_manager.get_session_summary(session_id)
-        session_context = self.session_manager.get_session_message_context(session_id)
+        with self._exact_response_cache_lock:
+            cached = self.exact_response_cache.get((user_id, session_id, message))
+        if cached is not None:
+            return None, cached, None
         
-        memories = self._get_memory_context(message, user_id)
+        session_state = asyncio.ensure_future(self._fetch_session_state(session_id))
+        try:
+            cache_embedding, cached = await asyncio.to_thread(self._lookup_similar_response, message, user_id, session_id)
+        except BaseException:
+            session_state.cancel()
+            raise
         
-        context = SYSTEM_PROMPT
-        context += f"\n MEMORIES: {memories}"
-        context += f"\n SUMMARY: {summary}"
-        context += f"\n SESSION CONTEXT: {session_context}"
+        if cached:
+            session_state.cancel()
+            session_state = None
+        return cache_embedding, cached, session_state
+
+    def _store_cached_response(self, embedding, message: str, user_id: str, session_id: str, response: str, memories: List[Memory]) -> None:
+        """Cache a generated response under its exact message and its message embedding."""
+        if embedding is not None:
+            with self._exact_response_cache_lock:
+                self.exact_response_cache[(user_id, session_id, message)] = (response, memories)
+            self.response_cache.store((user_id, session_id), embedding, (response, memories))
+
+    def _persist_turn(self, user_id: str, session_id: str, message: str, request_time, response: str, response_time) -> None:
+        """Store both sides of a chat turn and run topic change processing."""
+        self.session_manager.add_messages_to_session(session_id, [
+            ("user", message, request_time),
+            ("assistant", response, response_time)
+        ])
         
-        return context, memories
+        self.check_and_process_topic_change(user_id, session_id)
 
-    def _get_memory_context(self, message: str, user_id: str) -> List[Memory]:
-        """Get relevant memories for the current message."""
-        return self.search(
-            query=message, 
-            user_id=user_id, 
-            limit=self.config.memory_search_limit
-        )
+    def _schedule_persist_turn(self, user_id: str, session_id: str, message: str, request_time, response: str, response_time) -> None:
+        """Persist a chat turn in the background so the caller is not held up by database writes."""
+        task = asyncio.create_task(asyncio.to_thread(
+            self._persist_turn, user_id, session_id, message, request_time, response, response_time
+        ))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_persist_turn_done)
+
+    def _on_persist_turn_done(self, task: asyncio.Task) -> None:
+        """Release the task reference and log any persistence failure."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error("Error persisting chat turn: %s", task.exception())
 
-    def search(self, query: str, user_id: str, limit: int = 10) -> List[Memory]:
+    def search_with_context(self, query: str, user_id: str, limit: int = 10, query_embedding: Optional[List[float]] = None) -> tuple[str, List[Memory]]:
+        """
+        Search for memories once and format them for the prompt.
+        Returns the formatted memories context and the matching Memory objects.
+        """
+        memories = self.search(query=query, user_id=user_id, limit=limit, query_embedding=query_embedding)
+        if not memories:
+            return "No relevant memories found.", memories
+        
+        memories_context = "\n".join("- " + memory.content for memory in memories)
+        return memories_context, memories
+
+    def search(self, query: str, user_id: str, limit: Optional[int] = 10, query_embedding: Optional[List[float]] = None) -> List[Memory]:
         """
         Search for memories based on a query string.
+        Filler messages such as "ok" or "thanks" skip retrieval and return no memories.
+        A missing limit falls back to memory_search_limit, and limits are capped at 100.
+        An already computed query_embedding is reused instead of embedding the query again.
+        When the search cache is enabled, repeated queries and queries similar to an earlier one
+        are answered from cache until a write bumps the user's memory generation in Redis.
+        If Redis is unavailable the search bypasses the cache.
         Returns a list of Memory objects.
         """
-        embedding = self.embedder.embed(query)
-        results = self.tidb.search_memories(embedding, user_id, limit=limit)
-        return results.memories
+        limit = min(limit or self.config.memory_search_limit, _MAX_SEARCH_LIMIT)
+        normalized_query = " ".join(query.lower().split()).strip(".!?")
+        if len(normalized_query) < 3 or normalized_query in _FILLER_QUERIES:
+            return []
+        
+        generation = None
+        if self.memory_generations is not None:
+            try:
+                generation = self.memory_generations.get(user_id)
+            except redis.RedisError as e:
+                self.logger.warning("Memory generation lookup failed for user %s, searching without cache: %s", user_id, e)
+        
+        if generation is None:
+            embedding = query_embedding if query_embedding is not None else self.embedder.embed(query)
+            return self.tidb.search_memories(embedding, user_id, limit=limit).memories
+        
+        with self._exact_search_cache_lock:
+            key = hashlib.blake2b(
+                f"{user_id}\x00{generation}\x00{limit}\x00{normalized_query}".encode("utf-8"), digest_size=16
+            ).digest()
+            memories = self.exact_search_cache.get(key)
+            if memories is not None:
+                self._search_cache_stats["exact_hits"] += 1
+                return memories
+        
+        embedding = query_embedding if query_embedding is not None else self.embedder.embed(query)
+        memories = self.search_cache.lookup(user_id, embedding, tag=(generation, limit))
+        stat = "semantic_hits"
+        if memories is None:
+            stat = "misses"
+            memories = self.tidb.search_memories(embedding, user_id, limit=limit).memories
+            self.search_cache.store(user_id, embedding, memories, tag=(generation, limit))
+        
+        with self._exact_search_cache_lock:
+            self._search_cache_stats[stat] += 1
+            self.exact_search_cache[key] = memories
+        return memories
+
+    def search_cache_info(self) -> Dict[str, Any]:
+        """
+        Get search cache hit/miss counters and the exact-match cache occupancy.
+        """
+        with self._exact_search_cache_lock:
+            return {
+                "enabled": self.config.search_cache_enabled,
+                **self._search_cache_stats,
+                "currsize": self.exact_search_cache.currsize,
+                "maxsize": self.exact_search_cache.maxsize,
+                "ttl_seconds": self.exact_search_cache.ttl
+            }
+
+    def _invalidate_search_cache(self, user_id: str) -> None:
+        """Start a new memory generation for a user so earlier cached search results are no longer matched."""
+        if self.memory_generations is None:
+            return
+        try:
+            self.memory_generations.bump(user_id)
+        except redis.RedisError as e:
+            self.logger.warning(
+                "Could not invalidate search cache for user %s, cached results may be served for up to %ss: %s",
+                user_id, self.config.search_cache_ttl_seconds, e
+            )
 
     def get_all_memories(self, user_id: str) -> MemoryResponse:
         """        
@@ -136,6 +334,7 @@ class TiMemory:
         Delete all memories for a user.
         """
         self.tidb.delete_all_memories(user_id=user_id)
+        self._invalidate_search_cache(user_id)
 
     def check_and_process_topic_change(self, user_id: str, session_id: str) -> bool:
         """
@@ -149,33 +348,35 @@ class TiMemory:
             bool: True if topic change was detected and processing triggered
         """
         try:
-            if not self._should_process_memories(session_id):
+            state = self.session_manager.get_processing_state(session_id)
+            
+            if not self._should_process_memories(session_id, state):
                 return False
             
-            unprocessed_messages = self._get_unprocessed_messages(session_id)
+            unprocessed_messages = self._get_unprocessed_messages(session_id, state)
             
             if len(unprocessed_messages) < 2:
-                self.logger.info(f"Insufficient messages for topic change detection: {len(unprocessed_messages)} (need at least 2)")
+                self.logger.info("Insufficient messages for topic change detection: %s (need at least 2)", len(unprocessed_messages))
                 return False
             
-            self.logger.info(f"Checking {len(unprocessed_messages)} unprocessed messages for topic change in session {session_id}")
+            self.logger.info("Checking %s unprocessed messages for topic change in session %s", len(unprocessed_messages), session_id)
             topic_changed = self.topic_processor.detect_topic_change(unprocessed_messages)
             
             if topic_changed:
-                self.logger.info(f"Topic change detected! Processing {len(unprocessed_messages)} messages for memory extraction in session {session_id}")
+                self.logger.info("Topic change detected! Processing %s messages for memory extraction in session %s", len(unprocessed_messages), session_id)
                 
                 self._trigger_memory_processing(unprocessed_messages, user_id, session_id)
                 
-                if self._check_summary_needed(session_id):
+                if self._check_summary_needed(state):
                     self._generate_and_update_summary(session_id)
                 
                 return True
             else:
-                self.logger.info(f"No topic change detected for session {session_id}, skipping memory processing")
+                self.logger.info("No topic change detected for session %s, skipping memory processing", session_id)
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Error in topic change processing for session {session_id}: {e}")
+            self.logger.error("Error in topic change processing for session %s: %s", session_id, e)
             return False
 
     async def chat_with_memory(
@@ -198,26 +399,26 @@ class TiMemory:
             Dict with assistant's response and metadata
         """
         try:
-            from datetime import datetime, timezone
-            
-            context, memories_used = self._build_context(message, user_id, session_id)
-            
-            user_message = [{"role": "user", "content": message}]
-            
-            self.logger.debug(f"LLM call context - Instructions: {context}, Input: {user_message}")
+            cache_embedding, cached, session_state = await self._check_response_cache(message, user_id, session_id)
             
-            response = self.llm.generate_response(
-                instructions=context,
-                input=user_message
-            )
+            if cached:
+                assistant_response, memories_used = cached
+            else:
+                instructions, user_message, memories_used = await self._build_request(message, user_id, session_id, cache_embedding, session_state)
+                
+                self.logger.debug("LLM call context - Instructions: %s, Input: %s", instructions, user_message)
+                
+                response = await self.llm.agenerate_response(
+                    instructions=instructions,
+                    input=user_message
+                )
+                
+                assistant_response = response.output_text
+                self._store_cached_response(cache_embedding, message, user_id, session_id, assistant_response, memories_used)
             
-            assistant_response = response.output_text
             assistant_timestamp = datetime.now(timezone.utc)
             
-            self.session_manager.add_message_to_session(session_id, "user", message, request_time)
-            self.session_manager.add_message_to_session(session_id, "assistant", assistant_response, assistant_timestamp)
-            
-            self.check_and_process_topic_change(user_id, session_id)
+            self._schedule_persist_turn(user_id, session_id, message, request_time, assistant_response, assistant_timestamp)
             
             return {
                 "response": assistant_response,
@@ -228,7 +429,7 @@ class TiMemory:
             }
             
         except Exception as e:
-            self.logger.error(f"Error in chat_with_memory for user {user_id}: {e}")
+            self.logger.error("Error in chat_with_memory for user %s: %s", user_id, e)
             raise
 
     async def chat_with_memory_stream(
@@ -251,37 +452,35 @@ class TiMemory:
             Streaming response chunks
         """
         try:
-            from datetime import datetime, timezone
-            import openai
-            
-            context, memories_used = self._build_context(message, user_id, session_id)
-            
-            self.logger.info(f"LLM streaming call context - Instructions: {context}, Input: {message}")
-            
-            client = openai.OpenAI(api_key=self.config.openai_api_key)
+            cache_embedding, cached, session_state = await self._check_response_cache(message, user_id, session_id)
             
-            stream = client.chat.completions.create(
-                model=self.config.model_choice,
-                messages=[
-                    {"role": "system", "content": context},
-                    {"role": "user", "content": message}
-                ],
-                stream=True
-            )
-            
-            full_response = ""
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    yield content
+            if cached:
+                full_response, memories_used = cached
+                yield full_response
+            else:
+                instructions, user_message, memories_used = await self._build_request(message, user_id, session_id, cache_embedding, session_state)
+                
+                self.logger.debug("LLM streaming call context - Instructions: %s, Input: %s", instructions, user_message)
+                
+                stream = await self.llm.stream_response(
+                    instructions=instructions,
+                    input=user_message
+                )
+                
+                response_parts: List[str] = []
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        content = event.delta
+                        response_parts.append(content)
+                        yield content
+                
+                full_response = "".join(response_parts)
+                
+                self._store_cached_response(cache_embedding, message, user_id, session_id, full_response, memories_used)
             
             assistant_timestamp = datetime.now(timezone.utc)
             
-            self.session_manager.add_message_to_session(session_id, "user", message, request_time)
-            self.session_manager.add_message_to_session(session_id, "assistant", full_response, assistant_timestamp)
-            
-            self.check_and_process_topic_change(user_id, session_id)
+            self._schedule_persist_turn(user_id, session_id, message, request_time, full_response, assistant_timestamp)
             
             yield {
                 "user_id": user_id,
@@ -291,5 +490,5 @@ class TiMemory:
             }
             
         except Exception as e:
-            self.logger.error(f"Error in chat_with_memory_stream for user {user_id}: {e}")
+            self.logger.error("Error in chat_with_memory_stream for user %s: %s", user_id, e)
             raise
@@ -11,53 +11,59 @@ from app.services.memory_service import memory_service
 from app.dependencies.memory import get_available_memory_service
 from app.services.user_service import user_service
 from app.dependencies.auth import get_authenticated_user
-from app.dependencies.session import get_user_session
+from app.dependencies.session import get_user_session, verify_session_owner
 from app.dependencies.validation import validate_chat_request
 from TiMemory.schemas.memory import Memory, MemoryResponse
 from datetime import datetime, timezone
+import asyncio
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Cache-Control",
+    "X-Accel-Buffering": "no"
+}
+
 @router.post("/{user_id}/new")
-async def new_chat_session(user_id: str, request: ChatRequest, req: Request):
+async def new_chat_session(user_id: str, request: ChatRequest, req: Request, include_memories_used: bool = False):
     """
     Create new session and send first message
     Supports both streaming (Accept: text/event-stream) and regular (Accept: application/json) responses
+    Streaming responses only list the memories used when include_memories_used is set
     """
     request_time = datetime.now(timezone.utc)
     
-    await validate_chat_request(user_id, request)
+    validate_chat_request(user_id, request)
     await get_authenticated_user(user_id)
     
-    title = memory_service.memory.session_manager.generate_session_title(request.message)
-    session_response = memory_service.memory.session_manager.create_session(user_id, title)
+    session_response = await asyncio.to_thread(memory_service.create_session, user_id, request.message)
     session_id = session_response.session_id
+    title = session_response.title
     
     accept_header = req.headers.get("accept", "application/json")
     
     if "text/event-stream" in accept_header:
         async def stream_with_session_created():
-            import json
-            yield f"event: session_created\ndata: {json.dumps({'session_id': session_id, 'title': title})}\n\n"
+            yield b"event: session_created\ndata: " + orjson.dumps({'session_id': session_id, 'title': title}) + b"\n\n"
             async for chunk in chat_service.chat_with_memory_stream(
                 message=request.message,
                 user_id=user_id,
                 request_time=request_time,
-                session_id=session_id
+                session_id=session_id,
+                include_memories_used=include_memories_used
             ):
                 yield chunk
         
         return StreamingResponse(
             stream_with_session_created(), 
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Cache-Control"
-            }
+            headers=SSE_HEADERS
         )
         
     return await chat_service.chat_with_memory(
@@ -68,16 +74,19 @@ async def new_chat_session(user_id: str, request: ChatRequest, req: Request):
     )
 
 @router.post("/{user_id}/{session_id}")
-async def continue_chat_session(user_id: str, session_id: str, request: ChatRequest, req: Request):
+async def continue_chat_session(user_id: str, session_id: str, request: ChatRequest, req: Request, include_memories_used: bool = False):
     """
     Continue conversation in existing session
     Supports both streaming (Accept: text/event-stream) and regular (Accept: application/json) responses
+    Streaming responses only list the memories used when include_memories_used is set
     """
     request_time = datetime.now(timezone.utc)
     
-    await validate_chat_request(user_id, request)
-    await get_user_session(session_id, user_id)
-    await get_authenticated_user(user_id)
+    validate_chat_request(user_id, request)
+    await asyncio.gather(
+        verify_session_owner(session_id, user_id),
+        get_authenticated_user(user_id)
+    )
     
     accept_header = req.headers.get("accept", "application/json")
     
@@ -86,18 +95,14 @@ async def continue_chat_session(user_id: str, session_id: str, request: ChatRequ
             message=request.message,
             user_id=user_id,
             request_time=request_time,
-            session_id=session_id
+            session_id=session_id,
+            include_memories_used=include_memories_used
         )
         
         return StreamingResponse(
             stream_generator, 
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Cache-Control"
-            }
+            headers=SSE_HEADERS
         )
         
     return await chat_service.chat_with_memory(
@@ -112,7 +117,7 @@ async def get_user_sessions(user_id: str):
     """
     Get list of user's sessions
     """
-    sessions = memory_service.memory.session_manager.get_user_sessions(user_id)
+    sessions = await asyncio.to_thread(memory_service.get_user_sessions, user_id)
     return SessionListResponse(
         sessions=sessions,
         user_id=user_id,
@@ -132,9 +137,9 @@ async def update_user_session(user_id: str, session_id: str, request: UpdateSess
     """
     Update session metadata with user validation
     """
-    await get_user_session(session_id, user_id)
+    await verify_session_owner(session_id, user_id)
     
-    success = memory_service.memory.session_manager.update_session(session_id, request)
+    success = await asyncio.to_thread(memory_service.update_session, session_id, request)
     if not success:
         return {"message": "Session updated successfully"}
     return {"message": "Session updated successfully"}
@@ -144,9 +149,9 @@ async def delete_user_session(user_id: str, session_id: str):
     """
     Delete session with user validation
     """
-    await get_user_session(session_id, user_id)
+    await verify_session_owner(session_id, user_id)
     
-    success = memory_service.memory.session_manager.delete_session(session_id)
+    success = await asyncio.to_thread(memory_service.delete_session, session_id)
     if not success:
         return {"message": "Session deleted successfully"}
     return {"message": "Session deleted successfully"}
@@ -156,7 +161,7 @@ async def get_user_memories(user_id: str):
     """
     Get all memories for the user
     """
-    memories = memory_service.get_memories(user_id)
+    memories = await asyncio.to_thread(memory_service.get_memories, user_id)
     return memories
 
 @router.delete("/{user_id}/memories")
@@ -167,7 +172,7 @@ async def delete_user_memories(
     """
     Delete all memories for the user
     """
-    success = memory_svc.delete_memories(user_id)
+    success = await asyncio.to_thread(memory_svc.delete_memories, user_id)
     if success:
         return {"message": f"Memories deleted for user {user_id}"}
     else:
@@ -176,16 +181,19 @@ async def delete_user_memories(
 @router.get("/health")
 async def health_check():
     """
-    Health check endpoint for the chat service with TiDB Vector and database status
+    Health check endpoint for the chat service with TiDB Vector, database and search cache status
     """
-    vector_health = memory_service.get_vector_store_health()
-    db_health = user_service.get_database_health()
+    vector_health, db_health = await asyncio.gather(
+        asyncio.to_thread(memory_service.get_vector_store_health),
+        asyncio.to_thread(user_service.get_database_health)
+    )
     
     return {
         "status": "healthy",
         "service": "chat",
         "vector_store": vector_health,
         "database": db_health,
-        "timestamp": "2024-01-01T00:00:00Z"
+        "search_cache": memory_service.cache_info(),
+        "timestamp": datetime.now(timezone.utc)
     }
 
@@ -14,6 +14,8 @@ try:
     logger.info(f"Connecting to database: {memory_config.tidb_host}:{memory_config.tidb_port}")
     engine = create_engine(
         memory_config.tidb_connection_string,
+        pool_size=memory_config.tidb_pool_size,
+        max_overflow=memory_config.tidb_max_overflow,
         pool_pre_ping=True,
         pool_recycle=3600,
     )
@@ -22,7 +24,8 @@ except Exception as e:
     logger.error(f"Failed to create database engine: {e}")
     raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Users are returned after their session closes, so keep the committed values instead of reloading them
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 def create_tables():
     """Create backend database tables (Users only) if they don't exist"""
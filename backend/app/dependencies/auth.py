@@ -4,6 +4,7 @@ Authentication guards for FastAPI endpoints.
 
 from app.services.user_service import user_service
 from app.core.exceptions import ValidationException
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,14 +23,13 @@ async def get_authenticated_user(user_id: str):
     Raises:
         ValidationException: If user authentication fails
     """
-    user = user_service.get_or_create_user(user_id)
+    user = await asyncio.to_thread(user_service.authenticate_user, user_id)
     if not user:
         raise ValidationException(
             f"Failed to authenticate user: {user_id}",
             error_code="USER_AUTH_FAILED",
             details={"user_id": user_id}
         )
-    
-    user_service.update_user_activity(user_id)
-    logger.info(f"User {user_id} authenticated successfully")
+
+    logger.info("User %s authenticated successfully", user_id)
     return user
\ No newline at end of file
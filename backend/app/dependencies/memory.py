@@ -3,7 +3,7 @@ Memory service guards for FastAPI endpoints.
 """
 
 from app.services.memory_service import memory_service
-from app.core.exceptions import DatabaseException
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,10 +19,7 @@ async def get_available_memory_service():
     Raises:
         DatabaseException: If memory service is not available
     """
-    if not memory_service.memory:
-        raise DatabaseException(
-            f"Memory service not initialized: {memory_service.initialization_error or 'Unknown error'}"
-        )
+    await asyncio.to_thread(memory_service.ensure_initialized)
     
     logger.debug("Memory service availability confirmed")
     return memory_service
\ No newline at end of file
@@ -4,11 +4,51 @@ Session guards for FastAPI endpoints.
 
 from app.services.memory_service import memory_service
 from app.core.exceptions import DatabaseException, ValidationException
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _check_session_owner(session_id: str, user_id: str, owner):
+    """Raise if the session doesn't exist or belongs to another user"""
+    if not owner:
+        raise DatabaseException(
+            f"Session not found: {session_id}",
+            error_code="SESSION_NOT_FOUND",
+            details={"session_id": session_id}
+        )
+    
+    if owner != user_id:
+        raise ValidationException(
+            "Session access denied - session does not belong to user",
+            error_code="SESSION_ACCESS_DENIED",
+            details={
+                "session_id": session_id,
+                "user_id": user_id,
+                "session_owner": owner
+            }
+        )
+
+
+async def verify_session_owner(session_id: str, user_id: str):
+    """
+    Guard for session ownership that doesn't load the session's messages.
+    
+    Args:
+        session_id: The session ID to validate
+        user_id: The user ID that should own the session
+        
+    Raises:
+        DatabaseException: If session is not found
+        ValidationException: If session doesn't belong to user
+    """
+    owner = await asyncio.to_thread(memory_service.get_session_owner, session_id)
+    _check_session_owner(session_id, user_id, owner)
+    
+    logger.info("Session %s validated for user %s", session_id, user_id)
+
+
 async def get_user_session(session_id: str, user_id: str):
     """
     Guard for session validation with user ownership.
@@ -24,24 +64,8 @@ async def get_user_session(session_id: str, user_id: str):
         DatabaseException: If session is not found
         ValidationException: If session doesn't belong to user
     """
-    session = memory_service.memory.session_manager.get_session(session_id)
-    if not session:
-        raise DatabaseException(
-            f"Session not found: {session_id}",
-            error_code="SESSION_NOT_FOUND",
-            details={"session_id": session_id}
-        )
-    
-    if session.user_id != user_id:
-        raise ValidationException(
-            "Session access denied - session does not belong to user",
-            error_code="SESSION_ACCESS_DENIED",
-            details={
-                "session_id": session_id,
-                "user_id": user_id,
-                "session_owner": session.user_id
-            }
-        )
+    session = await asyncio.to_thread(memory_service.get_session, session_id)
+    _check_session_owner(session_id, user_id, session.user_id if session else None)
     
-    logger.info(f"Session {session_id} validated for user {user_id}")
-    return session
\ No newline at end of file
+    logger.info("Session %s validated for user %s", session_id, user_id)
+    return session
@@ -31,7 +31,7 @@ def validate_user_id_match(user_id: str, request_user_id: str):
         )
 
 
-async def validate_chat_request(user_id: str, request: ChatRequest):
+def validate_chat_request(user_id: str, request: ChatRequest):
     """
     Validator for chat request validation.
     
@@ -2,10 +2,12 @@ import logging
 from logging import basicConfig
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.v1.chat import router as chat_router
 from app.api.v1.admin import router as admin_router
 from app.core.config import settings
 from app.db.database import create_tables
+from app.services.memory_service import memory_service
 from app.middleware.request_id import RequestIDMiddleware
 from app.middleware.exception_handler import (
     database_exception_handler,
@@ -16,11 +18,17 @@ from app.middleware.exception_handler import (
 )
 from app.core.exceptions import DatabaseException, ValidationException, ChatException
 from contextlib import asynccontextmanager
+import asyncio
 import logfire
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    try:
+        # Connect to TiDB and OpenAI at startup so the first request doesn't pay for it
+        await asyncio.to_thread(memory_service.ensure_initialized)
+    except DatabaseException as e:
+        logger.warning("TiMemory unavailable at startup, retrying on first use: %s", e)
     yield
     pass
 
@@ -28,7 +36,8 @@ app = FastAPI(
     title="TiDB Vector Memory Chatbot API",
     description="TiMemory",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 logfire.configure(service_name="core", token=settings.logfire_token)
@@ -3,16 +3,16 @@ Global exception handler middleware for standardized error responses.
 """
 
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from app.core.exceptions import DatabaseException, ValidationException, ChatException
-from app.schemas.error import ErrorResponse, ValidationErrorResponse, DatabaseErrorResponse, ChatErrorResponse
+from app.schemas.error import ErrorResponse, validation_error_response, database_error_response, chat_error_response
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
-async def database_exception_handler(request: Request, exc: DatabaseException) -> JSONResponse:
+async def database_exception_handler(request: Request, exc: DatabaseException) -> ORJSONResponse:
     """Handle database-related exceptions."""
     request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
     
@@ -22,17 +22,17 @@ async def database_exception_handler(request: Request, exc: DatabaseException) -
         "details": exc.details
     })
     
-    response = DatabaseErrorResponse(
+    response = database_error_response(
+        exc.message,
         error_code=exc.error_code,
-        message=exc.message,
         details=exc.details,
-        timestamp=datetime.now(),
+        timestamp=datetime.now(timezone.utc),
         request_id=request_id
     )
-    return JSONResponse(status_code=500, content=response.model_dump(mode='json'))
+    return ORJSONResponse(status_code=500, content=response.model_dump(mode="json"))
 
 
-async def validation_exception_handler(request: Request, exc: ValidationException) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: ValidationException) -> ORJSONResponse:
     """Handle validation-related exceptions."""
     request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
     
@@ -48,17 +48,17 @@ async def validation_exception_handler(request: Request, exc: ValidationExceptio
     elif "not found" in exc.message.lower():
         status_code = 404
     
-    response = ValidationErrorResponse(
+    response = validation_error_response(
+        exc.message,
         error_code=exc.error_code,
-        message=exc.message,
         details=exc.details,
-        timestamp=datetime.now(),
+        timestamp=datetime.now(timezone.utc),
         request_id=request_id
     )
-    return JSONResponse(status_code=status_code, content=response.model_dump(mode='json'))
+    return ORJSONResponse(status_code=status_code, content=response.model_dump(mode="json"))
 
 
-async def chat_exception_handler(request: Request, exc: ChatException) -> JSONResponse:
+async def chat_exception_handler(request: Request, exc: ChatException) -> ORJSONResponse:
     """Handle chat-related exceptions."""
     request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
     
@@ -68,17 +68,17 @@ async def chat_exception_handler(request: Request, exc: ChatException) -> JSONRe
         "details": exc.details
     })
     
-    response = ChatErrorResponse(
+    response = chat_error_response(
+        exc.message,
         error_code=exc.error_code,
-        message=exc.message,
         details=exc.details,
-        timestamp=datetime.now(),
+        timestamp=datetime.now(timezone.utc),
         request_id=request_id
     )
-    return JSONResponse(status_code=500, content=response.model_dump(mode='json'))
+    return ORJSONResponse(status_code=500, content=response.model_dump(mode="json"))
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> ORJSONResponse:
     """Handle standard HTTP exceptions."""
     request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
     
@@ -87,13 +87,13 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     response = ErrorResponse(
         error_code="HTTP_ERROR",
         message=exc.detail,
-        timestamp=datetime.now(),
+        timestamp=datetime.now(timezone.utc),
         request_id=request_id
     )
-    return JSONResponse(status_code=exc.status_code, content=response.model_dump(mode='json'))
+    return ORJSONResponse(status_code=exc.status_code, content=response.model_dump(mode="json"))
 
 
-async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def general_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle unexpected exceptions."""
     request_id = getattr(request.state, 'request_id', str(uuid.uuid4()))
     
@@ -102,7 +102,7 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
     response = ErrorResponse(
         error_code="INTERNAL_ERROR",
         message="An unexpected error occurred",
-        timestamp=datetime.now(),
+        timestamp=datetime.now(timezone.utc),
         request_id=request_id
     )
-    return JSONResponse(status_code=500, content=response.model_dump(mode='json'))
\ No newline at end of file
+    return ORJSONResponse(status_code=500, content=response.model_dump(mode="json"))
\ No newline at end of file
@@ -4,7 +4,7 @@ Error response schemas for consistent API error handling.
 
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class ErrorResponse(BaseModel):
@@ -13,33 +13,25 @@ class ErrorResponse(BaseModel):
     error_code: str = Field(..., description="Unique error code identifier")
     message: str = Field(..., description="Human-readable error message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error context and details")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Error occurrence timestamp")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Error occurrence timestamp")
     request_id: Optional[str] = Field(None, description="Request identifier for tracking")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
-class ValidationErrorResponse(ErrorResponse):
-    """Specialized error response for validation errors."""
-    
-    error_code: str = Field(default="VALIDATION_ERROR", description="Validation error code")
-    field_errors: Optional[Dict[str, str]] = Field(None, description="Field-specific validation errors")
+def _error_response(default_code: str, message: str, error_code: Optional[str] = None, **kwargs) -> ErrorResponse:
+    """Build an ErrorResponse with a category-specific default error code."""
+    return ErrorResponse.model_construct(error_code=error_code or default_code, message=message, **kwargs)
 
 
-class DatabaseErrorResponse(ErrorResponse):
-    """Specialized error response for database errors."""
-    
-    error_code: str = Field(default="DATABASE_ERROR", description="Database error code")
-    operation: Optional[str] = Field(None, description="Database operation that failed")
+def validation_error_response(message: str, error_code: Optional[str] = None, **kwargs) -> ErrorResponse:
+    """Error response for validation errors."""
+    return _error_response("VALIDATION_ERROR", message, error_code, **kwargs)
 
 
-class ChatErrorResponse(ErrorResponse):
-    """Specialized error response for chat-related errors."""
-    
-    error_code: str = Field(default="CHAT_ERROR", description="Chat error code")
-    service: Optional[str] = Field(None, description="Service that encountered the error")
-    session_id: Optional[str] = Field(None, description="Session ID if applicable")
-    user_id: Optional[str] = Field(None, description="User ID if applicable")
\ No newline at end of file
+def database_error_response(message: str, error_code: Optional[str] = None, **kwargs) -> ErrorResponse:
+    """Error response for database errors."""
+    return _error_response("DATABASE_ERROR", message, error_code, **kwargs)
+
+
+def chat_error_response(message: str, error_code: Optional[str] = None, **kwargs) -> ErrorResponse:
+    """Error response for chat-related errors."""
+    return _error_response("CHAT_ERROR", message, error_code, **kwargs)
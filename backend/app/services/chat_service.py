@@ -1,12 +1,49 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator, List
 from app.services.memory_service import memory_service
 from app.schemas.chat import ChatResponse
+import asyncio
 import logging
 from datetime import datetime
-import json
+import time
+import orjson
 
 logger = logging.getLogger(__name__)
 
+_CONTENT_PREFIX = b"event: content\ndata: "
+_COMPLETE_PREFIX = b"event: complete\ndata: "
+_ERROR_PREFIX = b"event: error\ndata: "
+_FRAME_SUFFIX = b"\n\n"
+
+# Content deltas are coalesced into one frame until either threshold is reached
+_COALESCE_MIN_CHARS = 32
+_COALESCE_MAX_DELTAS = 8
+_COALESCE_MAX_DELAY = 0.025
+
+# Upstream items waiting to be encoded; the reader blocks once this many are queued
+_STREAM_QUEUE_SIZE = 256
+_STREAM_END = object()
+
+def _content_frame(content: str) -> bytes:
+    return _CONTENT_PREFIX + orjson.dumps({'content': content}) + _FRAME_SUFFIX
+
+async def _read_stream(stream: AsyncIterator, queue: asyncio.Queue) -> None:
+    """Move items from the upstream stream into the queue, finishing with the end marker or the raised exception."""
+    try:
+        async for item in stream:
+            await queue.put(item)
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(_STREAM_END)
+
+async def _wait_for_item(pending: asyncio.Task, timeout):
+    """
+    Wait up to timeout seconds (forever when None) for a pending queue.get() task.
+    Returns True when an item is ready; on timeout the task keeps waiting so no item is lost.
+    """
+    done, _ = await asyncio.wait((pending,), timeout=timeout)
+    return bool(done)
+
 class ChatService:
     """Service for handling chat interactions using TiMemory"""
     
@@ -46,7 +83,7 @@ class ChatService:
             )
             
         except Exception as e:
-            logger.error(f"Error in chat_with_memory for user {user_id}: {e}")
+            logger.error("Error in chat_with_memory for user %s: %s", user_id, e)
             raise
     
     async def chat_with_memory_stream(
@@ -54,8 +91,9 @@ class ChatService:
         message: str, 
         user_id: str,
         request_time: datetime,
-        session_id: str = None
-    ) -> AsyncGenerator[str, None]:
+        session_id: str = None,
+        include_memories_used: bool = False
+    ) -> AsyncGenerator[bytes, None]:
         """
         Process a chat message with memory context and session history (streaming version)
         
@@ -64,24 +102,73 @@ class ChatService:
             user_id: Unique identifier for the user
             request_time: Timestamp of the request
             session_id: Optional session identifier for conversation context
+            include_memories_used: Whether to list the memories used in the complete event
             
         Yields:
-            SSE-formatted strings with streaming response chunks
+            SSE-formatted frames, encoded as bytes, with streaming response chunks
         """
         try:
             stream_generator = memory_service.memory.chat_with_memory_stream(message, user_id, request_time, session_id)
             
-            async for content in stream_generator:
-                if isinstance(content, str):
-                    yield f"event: content\ndata: {json.dumps({'content': content})}\n\n"
-                elif isinstance(content, dict):
-                    # Topic change detection and memory processing now handled within chat_with_memory_stream
-                    yield f"event: complete\ndata: {json.dumps({'session_id': content.get('session_id'), 'memories': content.get('memories'), 'status': 'completed'})}\n\n"
-                    return
+            # Reading upstream runs in its own task so it overlaps with encoding and sending frames
+            queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+            reader = asyncio.create_task(_read_stream(stream_generator, queue))
+            
+            buffer: List[str] = []
+            buffered_chars = 0
+            last_flush = None
+            pending = None
+            
+            try:
+                while True:
+                    if pending is None:
+                        pending = asyncio.ensure_future(queue.get())
+                    # Buffered text is flushed on a timer so an upstream pause doesn't hold it back
+                    timeout = max(0.0, last_flush + _COALESCE_MAX_DELAY - time.monotonic()) if buffer else None
+                    if not await _wait_for_item(pending, timeout):
+                        yield _content_frame("".join(buffer))
+                        buffer.clear()
+                        buffered_chars = 0
+                        last_flush = time.monotonic()
+                        continue
+                    
+                    content = pending.result()
+                    pending = None
+                    if content is _STREAM_END:
+                        break
+                    if isinstance(content, Exception):
+                        raise content
+                    
+                    if isinstance(content, str):
+                        buffer.append(content)
+                        buffered_chars += len(content)
+                        now = time.monotonic()
+                        # The first delta is sent immediately to keep time-to-first-token low
+                        if (last_flush is None or buffered_chars >= _COALESCE_MIN_CHARS
+                                or len(buffer) >= _COALESCE_MAX_DELTAS or now - last_flush >= _COALESCE_MAX_DELAY):
+                            yield _content_frame("".join(buffer))
+                            buffer.clear()
+                            buffered_chars = 0
+                            last_flush = now
+                    elif isinstance(content, dict):
+                        if buffer:
+                            yield _content_frame("".join(buffer))
+                        # Topic change detection and memory processing now handled within chat_with_memory_stream
+                        memories = [memory.content for memory in content['memories_used']] if include_memories_used else []
+                        complete_data = {'session_id': content.get('session_id'), 'memories': memories, 'status': 'completed'}
+                        yield _COMPLETE_PREFIX + orjson.dumps(complete_data) + _FRAME_SUFFIX
+                        return
+            
+                if buffer:
+                    yield _content_frame("".join(buffer))
+            finally:
+                if pending is not None:
+                    pending.cancel()
+                reader.cancel()
             
         except Exception as e:
-            logger.error(f"Error in chat_with_memory_stream for user {user_id}: {e}")
+            logger.error("Error in chat_with_memory_stream for user %s: %s", user_id, e)
             error_data = {'error': str(e)}
-            yield f"event: error\ndata: {json.dumps(error_data)}\n\n"
+            yield _ERROR_PREFIX + orjson.dumps(error_data) + _FRAME_SUFFIX
 
 chat_service = ChatService()
\ No newline at end of file
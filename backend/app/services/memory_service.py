@@ -1,69 +1,152 @@
 from TiMemory import TiMemory
 from TiMemory.config.base import MemoryConfig
 from TiMemory.schemas.memory import MemoryResponse
-from typing import List, Dict, Any
-from app.core.exceptions import ChatException
+from TiMemory.schemas.session import (
+    CreateSessionResponse,
+    Session,
+    SessionSummary,
+    UpdateSessionRequest
+)
+from typing import List, Dict, Any, Optional
+from app.core.exceptions import ChatException, DatabaseException
+from sqlalchemy import text
+import cachetools.func
+import functools
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Health checks are polled by load balancers, so probe TiDB at most once per interval
+HEALTH_CACHE_TTL_SECONDS = 5
+
+
+def _require_memory(method):
+    """Raise DatabaseException instead of the method's own error when TiMemory can't be initialized"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._memory is None:
+            try:
+                self.memory
+            except Exception as e:
+                raise DatabaseException(
+                    f"Memory service not initialized: {self.initialization_error or 'Unknown error'}"
+                ) from e
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class MemoryService:
     """Service for managing persistent memory using TiMemory core system"""
     
     def __init__(self):
-        memory_config = MemoryConfig()
-        self.memory = TiMemory(config=memory_config)
+        self._memory: Optional[TiMemory] = None
+        self._memory_lock = threading.Lock()
+        self.initialization_error: Optional[str] = None
+        self._healthy_response: Optional[Dict[str, Any]] = None
     
+    @property
+    def memory(self) -> TiMemory:
+        """TiMemory instance, created on first use so importing the service doesn't connect to TiDB or OpenAI"""
+        if self._memory is None:
+            with self._memory_lock:
+                if self._memory is None:
+                    try:
+                        memory = TiMemory(config=MemoryConfig())
+                        self._healthy_response = self._build_healthy_response(memory.config)
+                        self._memory = memory
+                        self.initialization_error = None
+                    except Exception as e:
+                        self.initialization_error = str(e)
+                        logger.error("Failed to initialize TiMemory: %s", e)
+                        raise
+        return self._memory
     
-    def search_memories(self, query: str, user_id: str, limit: int = None) -> List[Dict[str, Any]]:
-        """Search for relevant memories based on query"""
-        try:
-            memories = self.memory.search(query=query, user_id=user_id, limit=limit)
-            return [{"content": mem.content, "type": mem.memory_attributes.type} for mem in memories]
-        except Exception as e:
-            logger.error(f"Error searching memories for user {user_id}: {e}")
-            raise ChatException(f"Memory search failed for user {user_id}") from e
+    @staticmethod
+    def _build_healthy_response(config: MemoryConfig) -> Dict[str, Any]:
+        """Static part of the health response, built once from the config TiMemory was created with"""
+        return {
+            "status": "healthy",
+            "vector_store": "tidb_native",
+            "config": {
+                "provider": "tidb_native",
+                "host": config.tidb_host,
+                "database": config.tidb_db_name,
+                "collection_name": config.memory_collection_name,
+                "embedding_dims": config.embedding_model_dims,
+                "ssl_enabled": config.tidb_use_ssl
+            }
+        }
+    
+    
+    @_require_memory
+    def ensure_initialized(self) -> None:
+        """Initialize TiMemory if needed, raising DatabaseException when it can't be"""
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """Search cache statistics for the health endpoint; never triggers TiMemory initialization"""
+        if self._memory is None:
+            return {"status": "unavailable"}
+        return self._memory.search_cache_info()
+    
+    @_require_memory
+    def create_session(self, user_id: str, first_message: str) -> CreateSessionResponse:
+        """Create a session titled from the user's first message"""
+        session_manager = self.memory.session_manager
+        title = session_manager.generate_session_title(first_message)
+        return session_manager.create_session(user_id, title)
     
+    @_require_memory
+    def get_session(self, session_id: str) -> Optional[Session]:
+        return self.memory.session_manager.get_session(session_id)
+    
+    @_require_memory
+    def get_session_owner(self, session_id: str) -> Optional[str]:
+        return self.memory.session_manager.get_session_owner(session_id)
+    
+    @_require_memory
+    def get_user_sessions(self, user_id: str) -> List[SessionSummary]:
+        return self.memory.session_manager.get_user_sessions(user_id)
+    
+    @_require_memory
+    def update_session(self, session_id: str, update_data: UpdateSessionRequest) -> bool:
+        return self.memory.session_manager.update_session(session_id, update_data)
+    
+    @_require_memory
+    def delete_session(self, session_id: str) -> bool:
+        return self.memory.session_manager.delete_session(session_id)
+    
+    @_require_memory
     def get_memories(self, user_id: str) -> MemoryResponse:
         try:
             memories = self.memory.get_all_memories(user_id=user_id)
             return memories
         except Exception as e:
-            logger.error(f"Error getting memories for user {user_id}: {e}")
+            logger.error("Error getting memories for user %s: %s", user_id, e)
             raise ChatException(f"Memory retrieval failed for user {user_id}") from e
     
+    @_require_memory
     def delete_memories(self, user_id: str) -> bool:
         """Delete all memories for a user"""
         try:
             self.memory.delete_all(user_id=user_id)
-            logger.info(f"Deleted memories for user {user_id}")
+            logger.info("Deleted memories for user %s", user_id)
             return True
         except Exception as e:
-            logger.error(f"Error deleting memories for user {user_id}: {e}")
+            logger.error("Error deleting memories for user %s: %s", user_id, e)
             raise ChatException(f"Memory delete failed for user {user_id}") from e
     
     def get_vector_store_health(self) -> Dict[str, Any]:
         """Check native TiDB Vector Store health"""
-        if not self.memory:
-            return {
-                "status": "unhealthy", 
-                "message": "Memory service not initialized"
-            }
-        
+        return self._compute_health()
+    
+    @cachetools.func.ttl_cache(maxsize=1, ttl=HEALTH_CACHE_TTL_SECONDS)
+    def _compute_health(self) -> Dict[str, Any]:
+        """Probe TiDB with SELECT 1 and report the vector store configuration"""
         try:
-            config = self.memory.config
-            return {
-                "status": "healthy",
-                "vector_store": "tidb_native",
-                "config": {
-                    "provider": "tidb_native",
-                    "host": config.tidb_host,
-                    "database": config.tidb_db_name,
-                    "collection_name": config.memory_collection_name,
-                    "embedding_dims": config.embedding_model_dims,
-                    "ssl_enabled": config.tidb_use_ssl
-                }
-            }
+            with self.memory.tidb.engine.connect() as connection:
+                connection.execute(text("SELECT 1")).fetchone()
+            return self._healthy_response
         except Exception as e:
             return {
                 "status": "unhealthy", 